@@ -31,6 +31,7 @@ Options:
     --yes              Skip confirmation prompts
     --remove-orphans   Remove orphaned index entries (default: keep)
     --recover-orphans  Copy orphaned sessions from other workspaces
+    --no-cache         Don't skip workspaces unchanged since the last repair
     --help, -h         Show this help message
 
 Examples:
@@ -52,15 +53,87 @@ Examples:
 IMPORTANT: Close VS Code completely before running this script!
 """
 
+import ctypes
 import json
+import json.encoder
+import mmap
+import os
 import sqlite3
 import shutil
 import sys
 import platform
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import closing
 from pathlib import Path
 from datetime import datetime
-from typing import List, Dict, Set, Optional
+from functools import lru_cache
+from typing import Any, List, Dict, Set, Optional, Union
+
+# orjson is optional: it parses and serializes several times faster than the
+# standard library, but the tool must keep working without it.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def json_loads(data: Union[bytes, memoryview, str]) -> Any:
+    """Parse JSON from a str or bytes-like object, using orjson when available."""
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            # orjson rejects lone surrogates and invalid UTF-8, which the
+            # standard library tolerates, so retry with it before giving up
+            pass
+    if isinstance(data, memoryview):
+        data = data.tobytes()
+    if isinstance(data, bytes):
+        data = data.decode('utf-8', 'replace')
+    return json.loads(data)
+
+def json_dumps(obj: Any) -> str:
+    """Serialize to compact JSON, using orjson when available."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj).decode('utf-8')
+        except orjson.JSONEncodeError:
+            pass
+    # Escaped output can carry lone surrogates that UTF-8 text cannot
+    return json.dumps(obj, separators=(',', ':'))
+
+def _load_json_fast(path: Path) -> Any:
+    """Load a JSON file, or return None if it is missing or empty.
+
+    Reading directly instead of checking exists() first saves a stat().
+    """
+    try:
+        data = path.read_bytes()
+    except FileNotFoundError:
+        return None
+    return json_loads(data) if data else None
+
+# Key of the chat session index in each workspace's ItemTable
+SESSION_INDEX_KEY = 'chat.ChatSessionStore.index'
+_INDEX_QUERY = "SELECT value FROM ItemTable WHERE key = ?"
+_INDEX_UPDATE = "INSERT OR REPLACE INTO ItemTable (key, value) VALUES (?, ?)"
 
+def read_index_entries(db_path: Path) -> Dict[str, Dict]:
+    """Read the entries of a workspace's chat session index.
+
+    Returns an empty dict if the database has no index yet. Raises if the
+    database or the index can't be read.
+    """
+    # Read-only, but not immutable: a -wal or hot journal next to the
+    # database may still hold the latest index
+    uri = db_path.resolve().as_uri() + "?mode=ro"
+    with closing(sqlite3.connect(uri, uri=True)) as conn:
+        row = conn.execute(_INDEX_QUERY, (SESSION_INDEX_KEY,)).fetchone()
+    if not row:
+        return {}
+    return json_loads(row[0]).get("entries", {})
+
+@lru_cache(maxsize=4096)
 def extract_project_name(folder_path: Optional[str]) -> Optional[str]:
     """Extract the project/folder name from a workspace folder path."""
     if not folder_path:
@@ -88,11 +161,31 @@ def get_vscode_storage_root() -> Path:
     else:  # Linux and others
         return home / ".config/Code/User/workspaceStorage"
 
+def get_cache_path() -> Path:
+    """Get the file where repair state is kept between runs."""
+    home = Path.home()
+    system = platform.system()
+
+    if system == "Darwin":  # macOS
+        cache_dir = home / "Library/Caches"
+    elif system == "Windows":
+        cache_dir = home / "AppData/Local"
+    else:  # Linux and others
+        cache_dir = Path(os.environ.get("XDG_CACHE_HOME") or home / ".cache")
+    return cache_dir / "vscode-chat-history-fix" / "state.json"
+
 def folders_match(folder1: Optional[str], folder2: Optional[str]) -> bool:
     """Check if two workspace folders likely refer to the same project."""
     if not folder1 or not folder2:
         return False
-    
+
+    # The comparison is symmetric, so normalize the order to share cache hits
+    if folder2 < folder1:
+        folder1, folder2 = folder2, folder1
+    return _folders_match(folder1, folder2)
+
+@lru_cache(maxsize=4096)
+def _folders_match(folder1: str, folder2: str) -> bool:
     name1 = extract_project_name(folder1)
     name2 = extract_project_name(folder2)
     
@@ -103,55 +196,64 @@ def folders_match(folder1: Optional[str], folder2: Optional[str]) -> bool:
     return name1.lower() == name2.lower()
 
 class WorkspaceInfo:
-    def __init__(self, workspace_dir: Path):
+    def __init__(self, workspace_dir: Path, mode: str = "repair"):
+        """Load a workspace's metadata, session files and index.
+
+        mode is "shallow" when only session IDs and counts are needed (e.g.
+        --list), or "repair" to also keep what repair_workspace() needs.
+        Anything that reads more than IDs must be skipped in shallow mode.
+        """
+        self.mode = mode
         self.path = workspace_dir
         self.id = workspace_dir.name
         self.sessions_dir = workspace_dir / "chatSessions"
         self.db_path = workspace_dir / "state.vscdb"
 
         # Load workspace metadata
-        workspace_json = workspace_dir / "workspace.json"
         self.folder = None
         self.workspace_file = None
-        if workspace_json.exists():
-            try:
-                with open(workspace_json, 'r') as f:
-                    info = json.load(f)
-                    # Check for folder-based workspace
-                    if 'folder' in info:
-                        folder = info['folder']
-                        if isinstance(folder, str):
-                            self.folder = folder
-                        elif isinstance(folder, dict) and 'path' in folder:
-                            self.folder = folder['path']
-                    # Check for .code-workspace file
-                    elif 'workspace' in info:
-                        self.workspace_file = info['workspace']
-            except:
-                pass
+        try:
+            info = _load_json_fast(workspace_dir / "workspace.json")
+            if info:
+                # Check for folder-based workspace
+                if 'folder' in info:
+                    folder = info['folder']
+                    if isinstance(folder, str):
+                        self.folder = folder
+                    elif isinstance(folder, dict) and 'path' in folder:
+                        self.folder = folder['path']
+                # Check for .code-workspace file
+                elif 'workspace' in info:
+                    self.workspace_file = info['workspace']
+        except:
+            pass
 
         # Get session IDs from disk
         self.sessions_on_disk: Set[str] = set()
         if self.sessions_dir.exists():
-            for session_file in self.sessions_dir.glob("*.json"):
-                self.sessions_on_disk.add(session_file.stem)
+            # Like glob("*.json"): hidden files are skipped and symlinked
+            # sessions count. is_file() only stats symlinks; the directory
+            # entry's type is enough for regular files.
+            with os.scandir(self.sessions_dir) as it:
+                self.sessions_on_disk = {
+                    e.name[:-5] for e in it
+                    if e.name.endswith(".json") and not e.name.startswith(".") and e.is_file()
+                }
 
-        # Get session IDs from index
+        # Get session IDs from index. The entries are kept so a repair that
+        # preserves them doesn't have to read the database again. A failed
+        # read is recorded so the repair doesn't mistake it for no entries.
+        self.index_entries: Dict[str, Dict] = {}
         self.sessions_in_index: Set[str] = set()
+        self.index_error: Optional[str] = None
         if self.db_path.exists():
             try:
-                conn = sqlite3.connect(self.db_path)
-                cursor = conn.cursor()
-                row = cursor.execute(
-                    "SELECT value FROM ItemTable WHERE key = 'chat.ChatSessionStore.index'"
-                ).fetchone()
-                conn.close()
-
-                if row:
-                    index = json.loads(row[0])
-                    self.sessions_in_index = set(index.get("entries", {}).keys())
-            except:
-                pass
+                entries = read_index_entries(self.db_path)
+                self.sessions_in_index = set(entries.keys())
+                if mode == "repair":
+                    self.index_entries = entries
+            except Exception as e:
+                self.index_error = str(e)
     
     def get_display_name(self) -> str:
         """Get a user-friendly display name for this workspace."""
@@ -186,46 +288,275 @@ class WorkspaceInfo:
     @property
     def needs_repair(self) -> bool:
         """True if the workspace has corrupted index."""
-        return len(self.missing_from_index) > 0 or len(self.orphaned_in_index) > 0
+        # Set equality fails fast on differing sizes and, unlike the two
+        # differences, builds no intermediate sets for healthy workspaces
+        return self.sessions_on_disk != self.sessions_in_index
 
     @property
     def has_sessions(self) -> bool:
         """True if workspace has any session files."""
         return len(self.sessions_on_disk) > 0
 
-def scan_workspaces() -> List[WorkspaceInfo]:
-    """Scan all VS Code workspaces and return their info."""
+def scan_workspaces(exclude: Optional[Set[str]] = None, mode: str = "repair") -> List[WorkspaceInfo]:
+    """Scan all VS Code workspaces and return their info.
+
+    Workspaces whose IDs are in exclude (e.g. already loaded) are skipped.
+    mode is passed on to WorkspaceInfo.
+    """
     storage_root = get_vscode_storage_root()
 
     if not storage_root.exists():
         return []
 
+    exclude = exclude or set()
+    with os.scandir(storage_root) as it:
+        dirs = [Path(e.path) for e in it if e.is_dir() and e.name not in exclude]
+
+    if not dirs:
+        return []
+
+    # Scanning is I/O-bound (SQLite reads, JSON loads, directory listings),
+    # so workspaces are scanned concurrently
     workspaces = []
-    for workspace_dir in storage_root.iterdir():
-        if workspace_dir.is_dir():
+    with ThreadPoolExecutor(max_workers=min(32, len(dirs))) as executor:
+        futures = {executor.submit(WorkspaceInfo, d, mode): d for d in dirs}
+        for future in as_completed(futures):
             try:
-                ws = WorkspaceInfo(workspace_dir)
+                ws = future.result()
                 if ws.has_sessions:  # Only include workspaces with sessions
                     workspaces.append(ws)
             except Exception as e:
-                print(f"⚠️  Warning: Failed to scan {workspace_dir.name}: {e}")
+                print(f"⚠️  Warning: Failed to scan {futures[future].name}: {e}")
 
+    workspaces.sort(key=lambda ws: ws.id)
     return workspaces
 
-def find_orphan_in_other_workspaces(session_id: str, current_workspace: WorkspaceInfo, all_workspaces: List[WorkspaceInfo]) -> Optional[Dict]:
+def build_session_index(workspaces: List[WorkspaceInfo]) -> Dict[str, WorkspaceInfo]:
+    """Map each session ID on disk to the first workspace that holds its file."""
+    index = {}
+    for ws in workspaces:
+        for session_id in ws.sessions_on_disk:
+            index.setdefault(session_id, ws)
+    return index
+
+def find_orphan_in_other_workspaces(session_id: str, current_workspace: WorkspaceInfo, session_index: Dict[str, WorkspaceInfo]) -> Optional[Dict]:
     """Check if an orphaned session ID exists as a file in another workspace.
     
     Returns a dict with workspace info and whether it's the same project folder.
     """
-    for ws in all_workspaces:
-        if ws.id != current_workspace.id and session_id in ws.sessions_on_disk:
-            same_project = folders_match(current_workspace.folder, ws.folder)
-            return {
-                'workspace': ws,
-                'same_project': same_project
-            }
+    ws = session_index.get(session_id)
+    if ws is not None and ws.id != current_workspace.id:
+        return {
+            'workspace': ws,
+            'same_project': folders_match(current_workspace.folder, ws.folder)
+        }
     return None
 
+def get_session_title(first_request: Dict) -> str:
+    """Derive a session title from the text of its first request."""
+    title = "Untitled Session"
+    if "message" in first_request and "parts" in first_request["message"]:
+        text_parts = [
+            p.get("text", "")
+            for p in first_request["message"]["parts"]
+            if "text" in p
+        ]
+        if text_parts:
+            title = text_parts[0].strip()
+            if len(title) > 100:
+                title = title[:97] + "..."
+            if not title:
+                title = "Untitled Session"
+    return title
+
+def extract_session_metadata(session_data: Dict) -> Dict:
+    """Extract the index metadata from a fully parsed session."""
+    metadata = {
+        'title': "Untitled Session",
+        'last_message_date': 0,
+        'initial_location': session_data.get("initialLocation", "panel"),
+        'is_empty': True
+    }
+
+    if "requests" in session_data and session_data["requests"]:
+        metadata['is_empty'] = False
+        metadata['title'] = get_session_title(session_data["requests"][0])
+        # Get timestamp from last request
+        metadata['last_message_date'] = session_data["requests"][-1].get("timestamp", 0)
+
+    return metadata
+
+_sqlite_json = threading.local()
+
+def _json_connection() -> sqlite3.Connection:
+    """Return this thread's in-memory connection for SQLite's JSON functions."""
+    conn = getattr(_sqlite_json, 'conn', None)
+    if conn is None:
+        conn = _sqlite_json.conn = sqlite3.connect(":memory:")
+    return conn
+
+# One multi-path json_extract() call parses the document only once
+_SESSION_METADATA_QUERY = (
+    "SELECT json_extract(CAST(? AS TEXT), '$.initialLocation', '$.requests[0].message', '$.requests[#-1].timestamp')"
+)
+# json_extract() gives null for missing keys as well; json_type() tells
+# them apart (NULL vs 'null') but costs another pass, so it's only asked
+# when a value came back null
+_SESSION_NULLS_QUERY = """
+SELECT json_type(doc, '$.initialLocation'), json_type(doc, '$.requests[#-1]'),
+       json_type(doc, '$.requests[#-1].timestamp')
+FROM (SELECT CAST(? AS TEXT) AS doc)
+"""
+
+def _query_session_metadata(data: mmap.mmap) -> Optional[Dict]:
+    """Extract the index metadata with SQLite's JSON1 functions.
+
+    SQLite walks the mapped file in C without decoding it or building
+    Python objects for the responses. Returns None if JSON1 is unavailable,
+    the document is invalid, or the result is ambiguous (no first request
+    message, or a last request that isn't an object).
+    """
+    conn = _json_connection()
+    try:
+        with memoryview(data) as view:
+            row = conn.execute(_SESSION_METADATA_QUERY, (view,)).fetchone()
+            initial_location, message, last_timestamp = json_loads(row[0])
+            if not isinstance(message, dict):
+                return None
+            if initial_location is None or last_timestamp is None:
+                location_type, last_request_type, timestamp_type = conn.execute(
+                    _SESSION_NULLS_QUERY, (view,)
+                ).fetchone()
+                if last_request_type != 'object':
+                    return None
+                if location_type is None:
+                    initial_location = "panel"
+                if timestamp_type is None:
+                    last_timestamp = 0
+    except sqlite3.Error:
+        return None
+
+    return {
+        'title': get_session_title({"message": message}),
+        'last_message_date': last_timestamp,
+        'initial_location': initial_location,
+        'is_empty': False
+    }
+
+def read_session_metadata(session_file: Path) -> Dict:
+    """Read the index metadata (title, dates, location) of a session file.
+
+    Sessions can be several megabytes, nearly all of it responses that the
+    index doesn't need, so SQLite's JSON functions are tried before a full
+    parse. The file is memory-mapped and handed to SQLite without being
+    copied or decoded.
+    """
+    fd = os.open(session_file, os.O_RDONLY | getattr(os, 'O_BINARY', 0))
+    try:
+        if os.fstat(fd).st_size == 0:
+            # Empty files can't be mapped; let the parser report them
+            return extract_session_metadata(json_loads(b''))
+
+        with mmap.mmap(fd, 0, access=mmap.ACCESS_READ) as mm:
+            try:
+                metadata = _query_session_metadata(mm)
+            except (ValueError, TypeError):
+                metadata = None
+
+            if metadata is None:
+                with memoryview(mm) as view:
+                    metadata = extract_session_metadata(json_loads(view))
+            return metadata
+    finally:
+        os.close(fd)
+
+# Layout of the index entries built by repair_workspace(), in key order
+_INDEX_ENTRY_KEYS = ("sessionId", "title", "lastMessageDate", "isImported", "initialLocation", "isEmpty")
+_INDEX_ENTRY_TEMPLATE = (
+    '%s:{"sessionId":%s,"title":%s,"lastMessageDate":%d,'
+    '"isImported":false,"initialLocation":%s,"isEmpty":%s}'
+)
+
+def _is_generated_entry(entry: Any) -> bool:
+    """True if an index entry has exactly the layout repair_workspace() builds.
+
+    The key order must match too: json.dumps keeps the order of the dict,
+    so only then is the template's output the same.
+    """
+    if not isinstance(entry, dict) or tuple(entry) != _INDEX_ENTRY_KEYS:
+        return False
+    date = entry["lastMessageDate"]
+    return (
+        isinstance(entry["sessionId"], str)
+        and isinstance(entry["title"], str)
+        and isinstance(date, int) and not isinstance(date, bool)
+        and entry["isImported"] is False
+        and isinstance(entry["initialLocation"], str)
+        and isinstance(entry["isEmpty"], bool)
+    )
+
+def encode_session_index(entries: Dict[str, Dict]) -> str:
+    """Serialize a chat session index to the JSON stored in ItemTable.
+
+    orjson serializes the whole index fastest. Without it, entries with the
+    fixed layout this tool generates are formatted from a template in which
+    only the strings need escaping, which is quicker than json.dumps
+    walking every dict. Other entries, e.g. ones kept from the existing
+    index, still go through json.dumps.
+    """
+    if orjson is not None:
+        return json_dumps({"version": 1, "entries": entries})
+
+    escape = json.encoder.encode_basestring_ascii
+    parts = []
+    for session_id, entry in entries.items():
+        if _is_generated_entry(entry):
+            parts.append(_INDEX_ENTRY_TEMPLATE % (
+                escape(session_id),
+                escape(entry["sessionId"]),
+                escape(entry["title"]),
+                entry["lastMessageDate"],
+                escape(entry["initialLocation"]),
+                'true' if entry["isEmpty"] else 'false'
+            ))
+        else:
+            parts.append(escape(session_id) + ':' + json_dumps(entry))
+    return '{"version":1,"entries":{' + ','.join(parts) + '}}'
+
+# ioctl request number for cloning a file on Linux (btrfs, XFS, ...)
+_FICLONE = 0x40049409
+
+def _clone_file(src: Path, dst: str) -> bool:
+    """Try to create dst as a copy-on-write clone of src.
+
+    A hard link is not a usable backup here: SQLite updates the database
+    file in place, so the link would see the same changes. A clone shares
+    data blocks until either file is written, which makes it as cheap as a
+    link while still being an independent copy.
+    """
+    system = platform.system()
+    try:
+        if system == "Darwin":
+            libc = ctypes.CDLL(None, use_errno=True)
+            return libc.clonefile(os.fsencode(src), os.fsencode(dst), 0) == 0
+        if system == "Linux":
+            import fcntl
+            with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+                fcntl.ioctl(fdst.fileno(), _FICLONE, fsrc.fileno())
+            shutil.copystat(src, dst)
+            return True
+    except (OSError, AttributeError):
+        pass
+    return False
+
+def create_backup(db_path: Path) -> str:
+    """Back up a workspace database next to it and return the backup path."""
+    backup_path = str(db_path) + f".backup.{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    if not _clone_file(db_path, backup_path):
+        # Cloning is unsupported on this filesystem/platform, do a full copy
+        shutil.copy2(db_path, backup_path)
+    return backup_path
+
 def repair_workspace(workspace: WorkspaceInfo, dry_run: bool = False, show_details: bool = False, remove_orphans: bool = False) -> Dict:
     """Repair a workspace's chat session index."""
     result = {
@@ -233,74 +564,52 @@ def repair_workspace(workspace: WorkspaceInfo, dry_run: bool = False, show_detai
         'sessions_restored': 0,
         'sessions_removed': 0,
         'error': None,
-        'restored_sessions': []
+        'restored_sessions': [],
+        'failed_sessions': []  # (session_id, error message)
     }
 
+    # Snapshot the set differences once; the properties recompute them on
+    # every access, which made the loop below quadratic
+    missing = workspace.missing_from_index
+    orphans = workspace.orphaned_in_index
+    sessions_dir = workspace.sessions_dir
+
     try:
+        if workspace.mode != "repair":
+            raise ValueError(f"workspace {workspace.id} was loaded in {workspace.mode} mode")
+
         # Build new index from all session files
         entries = {}
         
         # If not removing orphans, start with existing index entries
-        if not remove_orphans and workspace.db_path.exists():
-            try:
-                conn = sqlite3.connect(workspace.db_path)
-                cursor = conn.cursor()
-                row = cursor.execute(
-                    "SELECT value FROM ItemTable WHERE key = 'chat.ChatSessionStore.index'"
-                ).fetchone()
-                conn.close()
-                
-                if row:
-                    existing_index = json.loads(row[0])
-                    entries = existing_index.get("entries", {})
-            except:
-                pass
+        if not remove_orphans:
+            if workspace.index_error is not None:
+                # The scan couldn't read the index; read it again rather than
+                # dropping the entries kept from it
+                entries = dict(read_index_entries(workspace.db_path))
+                missing = workspace.sessions_on_disk - entries.keys()
+            else:
+                entries = dict(workspace.index_entries)
 
         for session_id in sorted(workspace.sessions_on_disk):
-            session_file = workspace.sessions_dir / f"{session_id}.json"
+            session_file = sessions_dir / f"{session_id}.json"
 
             try:
-                with open(session_file, 'r', encoding='utf-8') as f:
-                    session_data = json.load(f)
-
-                # Extract metadata
-                title = "Untitled Session"
-                last_message_date = 0
-                is_empty = True
-
-                if "requests" in session_data and session_data["requests"]:
-                    is_empty = False
-                    first_request = session_data["requests"][0]
-
-                    # Extract title from message parts
-                    if "message" in first_request and "parts" in first_request["message"]:
-                        text_parts = [
-                            p.get("text", "")
-                            for p in first_request["message"]["parts"]
-                            if "text" in p
-                        ]
-                        if text_parts:
-                            title = text_parts[0].strip()
-                            if len(title) > 100:
-                                title = title[:97] + "..."
-                            if not title:
-                                title = "Untitled Session"
-
-                    # Get timestamp from last request
-                    last_request = session_data["requests"][-1]
-                    last_message_date = last_request.get("timestamp", 0)
+                metadata = read_session_metadata(session_file)
+                title = metadata['title']
+                last_message_date = metadata['last_message_date']
 
                 entries[session_id] = {
                     "sessionId": session_id,
                     "title": title,
                     "lastMessageDate": last_message_date,
                     "isImported": False,
-                    "initialLocation": session_data.get("initialLocation", "panel"),
-                    "isEmpty": is_empty
+                    "initialLocation": metadata['initial_location'],
+                    "isEmpty": metadata['is_empty']
                 }
 
                 # Track if this session will be restored
-                if session_id in workspace.missing_from_index:
+                if session_id in missing:
                     result['restored_sessions'].append({
                         'id': session_id,
                         'title': title,
@@ -308,37 +617,38 @@ def repair_workspace(workspace: WorkspaceInfo, dry_run: bool = False, show_detai
                     })
 
             except Exception as e:
-                print(f"      ⚠️  Failed to read {session_id}: {e}")
+                result['failed_sessions'].append((session_id, str(e)))
 
         if not dry_run:
-            # Create backup
-            backup_path = str(workspace.db_path) + f".backup.{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-            shutil.copy2(workspace.db_path, backup_path)
-
-            # Update database
-            new_index = {
-                "version": 1,
-                "entries": entries
-            }
-
-            conn = sqlite3.connect(workspace.db_path)
-            cursor = conn.cursor()
+            create_backup(workspace.db_path)
 
-            index_json = json.dumps(new_index, separators=(',', ':'))
-            cursor.execute(
-                "INSERT OR REPLACE INTO ItemTable (key, value) VALUES (?, ?)",
-                ('chat.ChatSessionStore.index', index_json)
-            )
-
-            conn.commit()
-            conn.close()
+            conn = sqlite3.connect(workspace.db_path, isolation_level=None)
+            try:
+                # The database was just backed up, so skip the journal fsyncs
+                # for this single write. WAL databases keep their journal.
+                synchronous = conn.execute("PRAGMA synchronous").fetchone()[0]
+                journal_mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
+                conn.execute("PRAGMA synchronous=OFF")
+                if journal_mode == 'delete':
+                    conn.execute("PRAGMA journal_mode=MEMORY")
+
+                index_json = encode_session_index(entries)
+                conn.execute("BEGIN IMMEDIATE")
+                conn.execute(_INDEX_UPDATE, (SESSION_INDEX_KEY, index_json))
+                conn.execute("COMMIT")
+
+                if journal_mode == 'delete':
+                    conn.execute("PRAGMA journal_mode=DELETE")
+                conn.execute(f"PRAGMA synchronous={synchronous}")
+            finally:
+                conn.close()
 
         result['success'] = True
-        result['sessions_restored'] = len(workspace.missing_from_index)
+        result['sessions_restored'] = len(missing)
 
         # Only count removed sessions if we're actually removing orphans
         if remove_orphans:
-            result['sessions_removed'] = len(workspace.orphaned_in_index)
+            result['sessions_removed'] = len(orphans)
         else:
             result['sessions_removed'] = 0
 
@@ -347,6 +657,79 @@ def repair_workspace(workspace: WorkspaceInfo, dry_run: bool = False, show_detai
 
     return result
 
+def get_repair_stamp(workspace: WorkspaceInfo, remove_orphans: bool) -> Optional[List]:
+    """Identify the on-disk state of a workspace for the repair cache.
+
+    The database mtime changes on any write that reaches it, the -wal
+    file's mtime on writes still held there, and the sessions directory
+    mtime whenever a session file is added or removed.
+    """
+    wal_path = workspace.db_path.with_name(workspace.db_path.name + "-wal")
+    try:
+        wal_mtime = os.stat(wal_path).st_mtime_ns
+    except OSError:
+        wal_mtime = None
+    try:
+        return [
+            str(workspace.db_path),
+            os.stat(workspace.db_path).st_mtime_ns,
+            wal_mtime,
+            os.stat(workspace.sessions_dir).st_mtime_ns,
+            remove_orphans
+        ]
+    except OSError:
+        return None
+
+def find_unchanged_workspaces(workspaces: List[WorkspaceInfo], repair_cache: Dict[str, List], remove_orphans: bool) -> List[WorkspaceInfo]:
+    """Return the workspaces left untouched since this tool last repaired them.
+
+    A workspace with sessions missing from its index is never unchanged:
+    rewriting a session file in place doesn't change the directory mtime
+    in the stamp, so a session that failed to read before must be retried.
+    """
+    unchanged = []
+    for ws in workspaces:
+        if ws.missing_from_index:
+            continue
+        stamp = get_repair_stamp(ws, remove_orphans)
+        if stamp is not None and repair_cache.get(ws.id) == stamp:
+            unchanged.append(ws)
+    return unchanged
+
+def update_repair_cache(repair_cache: Dict[str, List], workspace: WorkspaceInfo, result: Dict, remove_orphans: bool):
+    """Record the stamp of a repaired workspace.
+
+    No stamp is kept when some sessions couldn't be read, so they're
+    retried on the next run.
+    """
+    stamp = None if result['failed_sessions'] else get_repair_stamp(workspace, remove_orphans)
+    if stamp is not None:
+        repair_cache[workspace.id] = stamp
+    else:
+        repair_cache.pop(workspace.id, None)
+
+def load_repair_cache() -> Dict[str, List]:
+    """Load the repair stamps saved by previous runs."""
+    try:
+        cache = _load_json_fast(get_cache_path())
+        return cache if isinstance(cache, dict) else {}
+    except:
+        return {}
+
+def save_repair_cache(cache: Dict[str, List]):
+    """Save repair stamps for the next run. Failures are not fatal."""
+    cache_path = get_cache_path()
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        cache_path.write_text(json_dumps(cache), encoding='utf-8')
+    except OSError as e:
+        print(f"⚠️  Warning: Failed to save repair cache: {e}")
+
+def _emit(lines: List[str]):
+    """Write a block of output lines with a single write call."""
+    if lines:
+        sys.stdout.write("\n".join(lines) + "\n")
+
 def list_workspaces_mode():
     """List all workspaces with chat sessions."""
     print()
@@ -355,7 +738,7 @@ def list_workspaces_mode():
     print("=" * 70)
     print()
 
-    workspaces = scan_workspaces()
+    workspaces = scan_workspaces(mode="shallow")
 
     if not workspaces:
         print("No workspaces with chat sessions found.")
@@ -365,28 +748,30 @@ def list_workspaces_mode():
     print()
 
     for i, ws in enumerate(workspaces, 1):
+        lines = []
         status = "⚠️  NEEDS REPAIR" if ws.needs_repair else "✅ HEALTHY"
-        print(f"{i}. {ws.get_display_name()} - {status}")
+        lines.append(f"{i}. {ws.get_display_name()} - {status}")
         
         # Show full ID if we have Unknown workspace
         if not ws.folder and not ws.workspace_file:
-            print(f"   ID: {ws.id}")
+            lines.append(f"   ID: {ws.id}")
         
         if ws.folder:
-            print(f"   Folder: {ws.folder}")
+            lines.append(f"   Folder: {ws.folder}")
         elif ws.workspace_file:
-            print(f"   Workspace file: {ws.workspace_file}")
+            lines.append(f"   Workspace file: {ws.workspace_file}")
         
-        print(f"   Sessions on disk: {len(ws.sessions_on_disk)}")
-        print(f"   Sessions in index: {len(ws.sessions_in_index)}")
+        lines.append(f"   Sessions on disk: {len(ws.sessions_on_disk)}")
+        lines.append(f"   Sessions in index: {len(ws.sessions_in_index)}")
         
         if ws.missing_from_index:
-            print(f"   ⚠️  Missing from index: {len(ws.missing_from_index)}")
+            lines.append(f"   ⚠️  Missing from index: {len(ws.missing_from_index)}")
         
         if ws.orphaned_in_index:
-            print(f"   🗑️  Orphaned in index: {len(ws.orphaned_in_index)}")
+            lines.append(f"   🗑️  Orphaned in index: {len(ws.orphaned_in_index)}")
         
-        print()
+        lines.append("")
+        _emit(lines)
 
     needs_repair = [ws for ws in workspaces if ws.needs_repair]
     
@@ -428,25 +813,28 @@ def repair_single_workspace(workspace_id: str, dry_run: bool, remove_orphans: bo
 
     workspace = WorkspaceInfo(workspace_path)
     
-    print(f"🔧 Workspace: {workspace.get_display_name()}")
+    lines = []
+    lines.append(f"🔧 Workspace: {workspace.get_display_name()}")
     if not workspace.folder and not workspace.workspace_file:
-        print(f"   ID: {workspace.id}")
+        lines.append(f"   ID: {workspace.id}")
     if workspace.folder:
-        print(f"   Folder: {workspace.folder}")
+        lines.append(f"   Folder: {workspace.folder}")
     elif workspace.workspace_file:
-        print(f"   Workspace file: {workspace.workspace_file}")
+        lines.append(f"   Workspace file: {workspace.workspace_file}")
     
-    print(f"   Sessions on disk: {len(workspace.sessions_on_disk)}")
-    print(f"   Sessions in index: {len(workspace.sessions_in_index)}")
-    print()
+    lines.append(f"   Sessions on disk: {len(workspace.sessions_on_disk)}")
+    lines.append(f"   Sessions in index: {len(workspace.sessions_in_index)}")
+    lines.append("")
+    _emit(lines)
 
     if not workspace.needs_repair:
         print("✅ This workspace doesn't need repair!")
         return 0
 
     # Show what needs fixing
+    lines = []
     if workspace.missing_from_index:
-        print(f"⚠️  Missing from index: {len(workspace.missing_from_index)}")
+        lines.append(f"⚠️  Missing from index: {len(workspace.missing_from_index)}")
     
     recoverable_orphans = {}
     
@@ -456,12 +844,13 @@ def repair_single_workspace(workspace_id: str, dry_run: bool, remove_orphans: bo
             orphan_msg += " (will be removed)"
         else:
             orphan_msg += " (will be kept)"
-        print(orphan_msg)
+        lines.append(orphan_msg)
         
-        # Check if orphans exist in other workspaces
-        all_workspaces = scan_workspaces()
+        # Check if orphans exist in other workspaces. This workspace is
+        # already loaded, so only the others need scanning.
+        session_index = build_session_index(scan_workspaces(exclude={workspace.id}, mode="shallow"))
         for session_id in workspace.orphaned_in_index:
-            found_info = find_orphan_in_other_workspaces(session_id, workspace, all_workspaces)
+            found_info = find_orphan_in_other_workspaces(session_id, workspace, session_index)
             if found_info:
                 recoverable_orphans[session_id] = found_info
                 found_ws = found_info['workspace']
@@ -469,15 +858,16 @@ def repair_single_workspace(workspace_id: str, dry_run: bool, remove_orphans: bo
                 
                 if same_project:
                     project_name = extract_project_name(workspace.folder)
-                    print(f"   💡 Session {session_id[:8]}... found in workspace: {found_ws.get_display_name()}")
-                    print(f"      ⭐ Same project folder: '{project_name}' - likely belongs here!")
+                    lines.append(f"   💡 Session {session_id[:8]}... found in workspace: {found_ws.get_display_name()}")
+                    lines.append(f"      ⭐ Same project folder: '{project_name}' - likely belongs here!")
                 else:
-                    print(f"   💡 Session {session_id[:8]}... found in workspace: {found_ws.get_display_name()}")
+                    lines.append(f"   💡 Session {session_id[:8]}... found in workspace: {found_ws.get_display_name()}")
         
         if recoverable_orphans and not recover_orphans:
-            print(f"   💡 Use --recover-orphans to copy these {len(recoverable_orphans)} session(s) back")
+            lines.append(f"   💡 Use --recover-orphans to copy these {len(recoverable_orphans)} session(s) back")
     
-    print()
+    lines.append("")
+    _emit(lines)
 
     # Recover orphaned sessions if requested
     if recover_orphans and recoverable_orphans and not dry_run:
@@ -499,6 +889,15 @@ def repair_single_workspace(workspace_id: str, dry_run: bool, remove_orphans: bo
         
         print()
 
+    if unchanged:
+        print(f"⏭️  Skipping {len(unchanged)} workspace(s) unchanged since the last repair")
+        print("   (use --no-cache to repair them anyway)")
+        print()
+        needs_repair = [ws for ws in needs_repair if ws not in unchanged]
+        if not needs_repair:
+            print("✅ No other workspaces need repair.")
+            return 0
+
     # Confirm before proceeding
     if not dry_run and not auto_yes:
         print("⚠️  This will modify the database for this workspace.")
@@ -514,6 +913,8 @@ def repair_single_workspace(workspace_id: str, dry_run: bool, remove_orphans: bo
     # Repair
     print("🔧 Repairing workspace...")
     result = repair_workspace(workspace, dry_run=dry_run, remove_orphans=remove_orphans)
+    for session_id, error in result['failed_sessions']:
+        print(f"      ⚠️  Failed to read {session_id}: {error}")
 
     if result['success']:
         print()
@@ -546,7 +947,7 @@ def repair_single_workspace(workspace_id: str, dry_run: bool, remove_orphans: bo
         print(f"❌ Repair failed: {result['error']}")
         return 1
 
-def repair_all_workspaces(dry_run: bool, auto_yes: bool, remove_orphans: bool, recover_orphans: bool):
+def repair_all_workspaces(dry_run: bool, auto_yes: bool, remove_orphans: bool, recover_orphans: bool, use_cache: bool = True):
     """Auto-repair all workspaces that need it."""
     print()
     print("=" * 70)
@@ -584,6 +985,15 @@ def repair_all_workspaces(dry_run: bool, auto_yes: bool, remove_orphans: bool, r
         print("✅ All workspaces are healthy! No repairs needed.")
         return 0
 
+    # Workspaces left untouched since this tool last repaired them (e.g. ones
+    # whose orphaned entries were kept) are still reported, but not rewritten.
+    # Orphan recovery depends on the other workspaces too, so it always
+    # repairs everything.
+    repair_cache = load_repair_cache() if use_cache else {}
+    unchanged = []
+    if repair_cache and not recover_orphans:
+        unchanged = find_unchanged_workspaces(needs_repair, repair_cache, remove_orphans)
+
     # Display workspaces that need repair
     print(f"🔧 Found {len(needs_repair)} workspace(s) needing repair:")
     print()
@@ -591,21 +1001,25 @@ def repair_all_workspaces(dry_run: bool, auto_yes: bool, remove_orphans: bool, r
     total_missing = 0
     total_orphaned = 0
     recoverable_orphans = {}  # session_id -> source workspace
+    session_index = build_session_index(workspaces)
 
     for i, ws in enumerate(needs_repair, 1):
-        print(f"{i}. Workspace: {ws.get_display_name()}")
+        lines = []
+        lines.append(f"{i}. Workspace: {ws.get_display_name()}")
         # Show full ID if we have Unknown workspace
         if not ws.folder and not ws.workspace_file:
-            print(f"   ID: {ws.id}")
+            lines.append(f"   ID: {ws.id}")
         if ws.folder:
-            print(f"   Folder: {ws.folder}")
+            lines.append(f"   Folder: {ws.folder}")
         elif ws.workspace_file:
-            print(f"   Workspace file: {ws.workspace_file}")
-        print(f"   Sessions on disk: {len(ws.sessions_on_disk)}")
-        print(f"   Sessions in index: {len(ws.sessions_in_index)}")
+            lines.append(f"   Workspace file: {ws.workspace_file}")
+        lines.append(f"   Sessions on disk: {len(ws.sessions_on_disk)}")
+        lines.append(f"   Sessions in index: {len(ws.sessions_in_index)}")
+        if ws in unchanged:
+            lines.append("   ⏭️  Unchanged since the last repair (will be skipped)")
 
         if ws.missing_from_index:
-            print(f"   ⚠️  Missing from index: {len(ws.missing_from_index)}")
+            lines.append(f"   ⚠️  Missing from index: {len(ws.missing_from_index)}")
             total_missing += len(ws.missing_from_index)
 
         if ws.orphaned_in_index:
@@ -614,12 +1028,12 @@ def repair_all_workspaces(dry_run: bool, auto_yes: bool, remove_orphans: bool, r
                 orphan_msg += " (will be removed)"
             else:
                 orphan_msg += " (will be kept - use --remove-orphans to remove)"
-            print(orphan_msg)
+            lines.append(orphan_msg)
             total_orphaned += len(ws.orphaned_in_index)
             
             # Check if orphans exist in other workspaces
             for session_id in ws.orphaned_in_index:
-                found_info = find_orphan_in_other_workspaces(session_id, ws, workspaces)
+                found_info = find_orphan_in_other_workspaces(session_id, ws, session_index)
                 if found_info:
                     recoverable_orphans[session_id] = found_info
                     found_ws = found_info['workspace']
@@ -628,12 +1042,13 @@ def repair_all_workspaces(dry_run: bool, auto_yes: bool, remove_orphans: bool, r
                     if same_project:
                         # Highlight that it's from the same project
                         project_name = extract_project_name(ws.folder)
-                        print(f"      💡 Session {session_id[:8]}... found in workspace: {found_ws.get_display_name()}")
-                        print(f"         ⭐ Same project folder: '{project_name}' - likely belongs here!")
+                        lines.append(f"      💡 Session {session_id[:8]}... found in workspace: {found_ws.get_display_name()}")
+                        lines.append(f"         ⭐ Same project folder: '{project_name}' - likely belongs here!")
                     else:
-                        print(f"      💡 Session {session_id[:8]}... found in workspace: {found_ws.get_display_name()}")
+                        lines.append(f"      💡 Session {session_id[:8]}... found in workspace: {found_ws.get_display_name()}")
 
-        print()
+        lines.append("")
+        _emit(lines)
 
     print(f"📊 Total issues:")
     print(f"   Sessions to restore: {total_missing}")
@@ -664,7 +1079,8 @@ def repair_all_workspaces(dry_run: bool, auto_yes: bool, remove_orphans: bool, r
                     break
         
         for target_ws, sessions_to_recover in recovery_map.items():
-            print(f"   Recovering to: {target_ws.get_display_name()}")
+            lines = []
+            lines.append(f"   Recovering to: {target_ws.get_display_name()}")
             
             # Ensure sessions directory exists
             target_ws.sessions_dir.mkdir(parents=True, exist_ok=True)
@@ -675,14 +1091,15 @@ def repair_all_workspaces(dry_run: bool, auto_yes: bool, remove_orphans: bool, r
                 
                 try:
                     shutil.copy2(source_file, target_file)
-                    print(f"      ✅ Copied {session_id[:8]}... from {source_ws.get_display_name()}")
+                    lines.append(f"      ✅ Copied {session_id[:8]}... from {source_ws.get_display_name()}")
                     total_recovered += 1
                     # Update the workspace's sessions_on_disk to include this session
                     target_ws.sessions_on_disk.add(session_id)
                 except Exception as e:
-                    print(f"      ❌ Failed to copy {session_id[:8]}...: {e}")
+                    lines.append(f"      ❌ Failed to copy {session_id[:8]}...: {e}")
             
-            print()
+            lines.append("")
+            _emit(lines)
         
         print(f"📥 Recovered {total_recovered} session(s)")
         print()
@@ -693,6 +1110,15 @@ def repair_all_workspaces(dry_run: bool, auto_yes: bool, remove_orphans: bool, r
             print(f"   {session_id[:8]}... from {found_ws.get_display_name()}")
         print()
 
+    if unchanged:
+        print(f"⏭️  Skipping {len(unchanged)} workspace(s) unchanged since the last repair")
+        print("   (use --no-cache to repair them anyway)")
+        print()
+        needs_repair = [ws for ws in needs_repair if ws not in unchanged]
+        if not needs_repair:
+            print("✅ No other workspaces need repair.")
+            return 0
+
     # Confirm before proceeding
     if not dry_run and not auto_yes:
         print("⚠️  This will modify the database for these workspaces.")
@@ -712,25 +1138,43 @@ def repair_all_workspaces(dry_run: bool, auto_yes: bool, remove_orphans: bool, r
     success_count = 0
     fail_count = 0
 
-    for ws in needs_repair:
-        print(f"   Repairing: {ws.get_display_name()}")
-        if ws.folder:
-            print(f"      Path: {ws.folder}")
-
-        result = repair_workspace(ws, dry_run=dry_run, show_details=dry_run, remove_orphans=remove_orphans)
-
-        if result['success']:
-            if result['sessions_restored'] > 0:
-                print(f"      ✅ Will restore {result['sessions_restored']} session(s)" if dry_run else f"      ✅ Restored {result['sessions_restored']} session(s)")
+    # Each workspace has its own database, so repairs can run concurrently.
+    # Results are reported in submission order, each once its repair is done.
+    with ThreadPoolExecutor(max_workers=min(32, len(needs_repair))) as executor:
+        futures = [
+            executor.submit(repair_workspace, ws, dry_run=dry_run, show_details=dry_run, remove_orphans=remove_orphans)
+            for ws in needs_repair
+        ]
+
+        for ws, future in zip(needs_repair, futures):
+            lines = []
+            lines.append(f"   Repairing: {ws.get_display_name()}")
+            if ws.folder:
+                lines.append(f"      Path: {ws.folder}")
+
+            result = future.result()
+            for session_id, error in result['failed_sessions']:
+                lines.append(f"      ⚠️  Failed to read {session_id}: {error}")
+
+            if result['success'] and not dry_run:
+                update_repair_cache(repair_cache, ws, result, remove_orphans)
+
+            if result['success']:
+                if result['sessions_restored'] > 0:
+                    lines.append(f"      ✅ Will restore {result['sessions_restored']} session(s)" if dry_run else f"      ✅ Restored {result['sessions_restored']} session(s)")
+
+                if result['sessions_removed'] > 0:
+                    lines.append(f"      🗑️  Will remove {result['sessions_removed']} orphaned entr(y|ies)" if dry_run else f"      🗑️  Removed {result['sessions_removed']} orphaned entr(y|ies)")
+                success_count += 1
+            else:
+                lines.append(f"      ❌ Failed: {result['error']}")
+                fail_count += 1
 
-            if result['sessions_removed'] > 0:
-                print(f"      🗑️  Will remove {result['sessions_removed']} orphaned entr(y|ies)" if dry_run else f"      🗑️  Removed {result['sessions_removed']} orphaned entr(y|ies)")
-            success_count += 1
-        else:
-            print(f"      ❌ Failed: {result['error']}")
-            fail_count += 1
+            lines.append("")
+            _emit(lines)
 
-        print()
+    if use_cache and not dry_run and success_count > 0:
+        save_repair_cache(repair_cache)
 
     # Summary
     print("=" * 70)
@@ -772,6 +1216,7 @@ def main():
     remove_orphans = '--remove-orphans' in sys.argv
     recover_orphans = '--recover-orphans' in sys.argv
     list_mode = '--list' in sys.argv
+    use_cache = '--no-cache' not in sys.argv
     show_help = '--help' in sys.argv or '-h' in sys.argv
 
     if show_help:
@@ -814,7 +1259,7 @@ def main():
             print("❌ Aborted. Please close VS Code and run this script again.")
             return 1
 
-    return repair_all_workspaces(dry_run, auto_yes, remove_orphans, recover_orphans)
+    return repair_all_workspaces(dry_run, auto_yes, remove_orphans, recover_orphans, use_cache)
 
 if __name__ == "__main__":
     exit_code = main()
@@ -0,0 +1,331 @@
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import fix_chat_history  # noqa: E402
+
+
+def make_request(text, timestamp=None, **extra):
+    request = {
+        "requestId": "request_" + text,
+        "message": {"parts": [{"text": text, "kind": "text"}], "text": text},
+        "response": [{"value": "x" * 100_000}],
+    }
+    if timestamp is not None:
+        request["timestamp"] = timestamp
+    request.update(extra)
+    return request
+
+
+def make_session(requests, **trailing):
+    session = {
+        "version": 3,
+        "requesterUsername": "user",
+        "responderUsername": "GitHub Copilot",
+        "initialLocation": "panel",
+        "requests": requests,
+        "sessionId": "0f8fad5b-d9cb-469f-a165-70867728950e",
+        "creationDate": 100,
+        "isImported": False,
+        "lastMessageDate": 200,
+    }
+    session.update(trailing)
+    return session
+
+
+class ReadSessionMetadataTests(unittest.TestCase):
+    """read_session_metadata() must match a full parse of the session."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def write(self, text):
+        path = Path(self.tmp.name) / "session.json"
+        path.write_text(text, encoding="utf-8")
+        return path
+
+    def assertMatchesFullParse(self, session, indent=None):
+        text = json.dumps(session, indent=indent)
+        expected = fix_chat_history.extract_session_metadata(json.loads(text))
+        self.assertEqual(fix_chat_history.read_session_metadata(self.write(text)), expected)
+        return expected
+
+    def test_typical_session(self):
+        session = make_session([make_request("first", 100), make_request("last", 200)])
+        self.assertEqual(self.assertMatchesFullParse(session)['last_message_date'], 200)
+        self.assertMatchesFullParse(session, indent=2)
+
+    def test_nested_timestamp_in_last_request(self):
+        session = make_session([
+            make_request("first", 100),
+            make_request("last", 200, result={"timestamp": 999}),
+        ])
+        self.assertEqual(self.assertMatchesFullParse(session)['last_message_date'], 200)
+
+    def test_timestamp_in_trailing_top_level_object(self):
+        session = make_session(
+            [make_request("first", 100), make_request("last", 200)],
+            metadata={"timestamp": 5000},
+        )
+        self.assertEqual(self.assertMatchesFullParse(session)['last_message_date'], 200)
+
+    def test_timestamp_in_trailing_top_level_array(self):
+        session = make_session(
+            [make_request("first", 100), make_request("last", 200)],
+            events=[{"timestamp": 5000}],
+        )
+        self.assertEqual(self.assertMatchesFullParse(session)['last_message_date'], 200)
+
+    def test_last_request_without_timestamp(self):
+        session = make_session([make_request("first", 100), make_request("last")])
+        self.assertEqual(self.assertMatchesFullParse(session)['last_message_date'], 0)
+
+    def test_float_timestamp(self):
+        session = make_session([make_request("first", 100), make_request("last", 200.5)])
+        self.assertEqual(self.assertMatchesFullParse(session)['last_message_date'], 200.5)
+
+    def test_keys_after_timestamp_in_last_request(self):
+        session = make_session([
+            make_request("first", 100),
+            make_request("last", 200, modelId="copilot/gpt-4o", result={"timestamp": 999}),
+        ])
+        self.assertEqual(self.assertMatchesFullParse(session)['last_message_date'], 200)
+
+    def test_single_and_empty_requests(self):
+        self.assertMatchesFullParse(make_session([make_request("only", 100)]))
+        self.assertMatchesFullParse(make_session([]))
+
+    def test_initial_location_after_requests(self):
+        session = make_session([make_request("first", 100), make_request("last", 200)])
+        del session["initialLocation"]
+        session["initialLocation"] = "editor"
+        self.assertMatchesFullParse(session)
+
+    def test_null_initial_location_after_requests(self):
+        session = make_session([make_request("first", 100), make_request("last", 200)])
+        del session["initialLocation"]
+        session["initialLocation"] = None
+        self.assertIsNone(self.assertMatchesFullParse(session)['initial_location'])
+
+    def test_missing_initial_location(self):
+        session = make_session([make_request("first", 100), make_request("last", 200)])
+        del session["initialLocation"]
+        self.assertEqual(self.assertMatchesFullParse(session)['initial_location'], "panel")
+
+    def test_null_timestamp_in_last_request(self):
+        last = make_request("last")
+        last["timestamp"] = None
+        last["result"] = {"timestamp": 999}
+        session = make_session([make_request("first", 100), last])
+        self.assertIsNone(self.assertMatchesFullParse(session)['last_message_date'])
+
+    def test_corrupt_middle_is_rejected(self):
+        text = json.dumps(make_session([
+            make_request("first", 100),
+            make_request("middle", 150),
+            make_request("last", 200),
+        ]))
+        middle = text.index('"request_middle"')
+        path = self.write(text[:middle] + text[middle + 1:])
+        with self.assertRaises(ValueError):
+            json.loads(path.read_text(encoding="utf-8"))
+        with self.assertRaises(ValueError):
+            fix_chat_history.read_session_metadata(path)
+
+
+def make_workspace(root, workspace_id, on_disk, in_index):
+    """Create a workspace directory with session files and an index."""
+    workspace_dir = Path(root) / workspace_id
+    sessions_dir = workspace_dir / "chatSessions"
+    sessions_dir.mkdir(parents=True)
+    for session_id in on_disk:
+        session = make_session([make_request(session_id, 100)])
+        (sessions_dir / f"{session_id}.json").write_text(json.dumps(session), encoding="utf-8")
+    entries = {session_id: {"sessionId": session_id, "title": "old"} for session_id in in_index}
+    conn = sqlite3.connect(str(workspace_dir / "state.vscdb"))
+    conn.execute("CREATE TABLE ItemTable (key TEXT UNIQUE ON CONFLICT REPLACE, value BLOB)")
+    conn.execute(
+        "INSERT INTO ItemTable VALUES (?, ?)",
+        (fix_chat_history.SESSION_INDEX_KEY, json.dumps({"version": 1, "entries": entries})),
+    )
+    conn.commit()
+    conn.close()
+    return workspace_dir
+
+
+def index_entries(workspace_dir):
+    return fix_chat_history.read_index_entries(workspace_dir / "state.vscdb")
+
+
+class RepairWorkspaceTests(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def test_symlinked_session_is_on_disk(self):
+        workspace_dir = make_workspace(self.tmp.name, "ws", ["s1"], ["s1", "linked"])
+        target = Path(self.tmp.name) / "linked.json"
+        target.write_text(json.dumps(make_session([make_request("linked", 100)])), encoding="utf-8")
+        try:
+            os.symlink(target, workspace_dir / "chatSessions" / "linked.json")
+        except (OSError, NotImplementedError):
+            self.skipTest("symlinks are not supported here")
+
+        workspace = fix_chat_history.WorkspaceInfo(workspace_dir)
+        self.assertEqual(workspace.sessions_on_disk, {"s1", "linked"})
+        self.assertEqual(workspace.orphaned_in_index, set())
+
+    def test_failed_index_read_keeps_orphans(self):
+        workspace_dir = make_workspace(self.tmp.name, "ws", ["s1", "s2"], ["s1", "orphan"])
+        real_read = fix_chat_history.read_index_entries
+        calls = []
+
+        def flaky_read(db_path):
+            calls.append(db_path)
+            if len(calls) == 1:
+                raise sqlite3.OperationalError("unable to open database file")
+            return real_read(db_path)
+
+        with mock.patch.object(fix_chat_history, "read_index_entries", flaky_read):
+            workspace = fix_chat_history.WorkspaceInfo(workspace_dir)
+            self.assertIsNotNone(workspace.index_error)
+            result = fix_chat_history.repair_workspace(workspace)
+
+        self.assertTrue(result['success'], result['error'])
+        self.assertEqual(result['sessions_restored'], 1)
+        self.assertEqual(set(index_entries(workspace_dir)), {"s1", "s2", "orphan"})
+
+
+class RepairCacheTests(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        cache_path = Path(self.tmp.name) / "cache" / "state.json"
+        patcher = mock.patch.object(fix_chat_history, "get_cache_path", return_value=cache_path)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def repaired_workspace(self, on_disk, in_index):
+        """Repair a new workspace, keeping orphans, and return its cache."""
+        workspace_dir = make_workspace(self.tmp.name, "ws", on_disk, in_index)
+        workspace = fix_chat_history.WorkspaceInfo(workspace_dir)
+        result = fix_chat_history.repair_workspace(workspace)
+        self.assertTrue(result['success'], result['error'])
+        cache = {}
+        fix_chat_history.update_repair_cache(cache, workspace, result, False)
+        return workspace_dir, cache
+
+    def test_load_and_save(self):
+        self.assertEqual(fix_chat_history.load_repair_cache(), {})
+        cache = {"ws": ["/path/state.vscdb", 1, None, 2, False]}
+        fix_chat_history.save_repair_cache(cache)
+        self.assertEqual(fix_chat_history.load_repair_cache(), cache)
+
+    def test_load_ignores_corrupt_cache(self):
+        cache_path = fix_chat_history.get_cache_path()
+        cache_path.parent.mkdir(parents=True)
+        cache_path.write_text("{not json", encoding="utf-8")
+        self.assertEqual(fix_chat_history.load_repair_cache(), {})
+
+    def test_unchanged_workspace_with_kept_orphan_is_skipped(self):
+        workspace_dir, cache = self.repaired_workspace(["s1"], ["s1", "orphan"])
+        workspace = fix_chat_history.WorkspaceInfo(workspace_dir)
+        self.assertTrue(workspace.needs_repair)
+        self.assertEqual(fix_chat_history.find_unchanged_workspaces([workspace], cache, False), [workspace])
+        # The stamp depends on the orphan mode
+        self.assertEqual(fix_chat_history.find_unchanged_workspaces([workspace], cache, True), [])
+
+    def test_changed_database_is_not_skipped(self):
+        workspace_dir, cache = self.repaired_workspace(["s1"], ["s1", "orphan"])
+        db_path = workspace_dir / "state.vscdb"
+        stat = db_path.stat()
+        os.utime(db_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        workspace = fix_chat_history.WorkspaceInfo(workspace_dir)
+        self.assertEqual(fix_chat_history.find_unchanged_workspaces([workspace], cache, False), [])
+
+    def test_new_wal_file_is_not_skipped(self):
+        workspace_dir, cache = self.repaired_workspace(["s1"], ["s1", "orphan"])
+        (workspace_dir / "state.vscdb-wal").write_bytes(b"")
+        workspace = fix_chat_history.WorkspaceInfo(workspace_dir)
+        self.assertEqual(fix_chat_history.find_unchanged_workspaces([workspace], cache, False), [])
+
+    def test_workspace_with_missing_sessions_is_not_skipped(self):
+        workspace_dir, cache = self.repaired_workspace(["s1"], ["s1", "orphan"])
+        workspace = fix_chat_history.WorkspaceInfo(workspace_dir)
+        # Same stamp, but a session is missing from the index (e.g. it was
+        # unreadable and has since been fixed in place)
+        workspace.sessions_in_index.discard("s1")
+        self.assertEqual(fix_chat_history.find_unchanged_workspaces([workspace], cache, False), [])
+
+    def test_failed_session_read_drops_stamp(self):
+        workspace_dir = make_workspace(self.tmp.name, "ws", ["s1", "bad"], ["s1"])
+        (workspace_dir / "chatSessions" / "bad.json").write_text("{", encoding="utf-8")
+        workspace = fix_chat_history.WorkspaceInfo(workspace_dir)
+        result = fix_chat_history.repair_workspace(workspace)
+        self.assertTrue(result['success'], result['error'])
+        self.assertEqual([session_id for session_id, _ in result['failed_sessions']], ["bad"])
+
+        cache = {"ws": ["stale"]}
+        fix_chat_history.update_repair_cache(cache, workspace, result, False)
+        self.assertEqual(cache, {})
+
+
+class EncodeSessionIndexTests(unittest.TestCase):
+    """Without orjson the index must serialize exactly like json.dumps."""
+
+    def setUp(self):
+        patcher = mock.patch.object(fix_chat_history, "orjson", None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def assertMatchesJsonDumps(self, entries):
+        expected = json.dumps({"version": 1, "entries": entries}, separators=(',', ':'))
+        self.assertEqual(fix_chat_history.encode_session_index(entries), expected)
+
+    def generated_entry(self, session_id, **changes):
+        entry = {
+            "sessionId": session_id,
+            "title": "Fix the \"parser\" ünï \ud83d\ude00\n",
+            "lastMessageDate": 1700000000000,
+            "isImported": False,
+            "initialLocation": "panel",
+            "isEmpty": False,
+        }
+        entry.update(changes)
+        return entry
+
+    def test_generated_entries(self):
+        self.assertMatchesJsonDumps({
+            "s1": self.generated_entry("s1"),
+            "s2": self.generated_entry("s2", isEmpty=True, initialLocation="editor"),
+            "s3": self.generated_entry("s3", title="lone \ud800 surrogate"),
+        })
+
+    def test_kept_entries(self):
+        reordered = self.generated_entry("s2")
+        reordered = {key: reordered[key] for key in reversed(list(reordered))}
+        self.assertMatchesJsonDumps({
+            "s1": self.generated_entry("s1"),
+            "s2": reordered,
+            "s3": self.generated_entry("s3", lastMessageDate=200.5),
+            "s4": self.generated_entry("s4", initialLocation=None, lastMessageDate=None),
+            "s5": {"sessionId": "s5", "title": "old", "isImported": True, "extra": [1, 2]},
+            "s6": self.generated_entry("s6", lastMessageDate=True),
+        })
+
+    def test_empty_index(self):
+        self.assertMatchesJsonDumps({})
+
+
+if __name__ == "__main__":
+    unittest.main()